@@ -0,0 +1,86 @@
+"""浏览器启动开销测试：比较三种chromedriver使用方式的单次启动耗时
+
+    default  每次 webdriver.Chrome(options=...)，由selenium查找驱动并启动新的chromedriver（修改前）
+    cached   使用缓存的驱动路径，每次启动新的chromedriver
+    shared   使用缓存的驱动路径，所有会话共用一个chromedriver
+
+用法:
+    python benchmarks/launch_overhead.py --launches 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from core.browser import BrowserManager
+from core.driver_service import SharedDriverService, resolve_driver_path
+
+
+def make_options(profile_path):
+    options = Options()
+    options.add_argument(f"user-data-dir={profile_path}")
+    options.add_argument("--headless=new")
+    return options
+
+
+def launch_default(profile_path):
+    return webdriver.Chrome(options=make_options(profile_path))
+
+
+def measure(name, launch, launches):
+    """逐个启动并关闭浏览器，返回每次启动的耗时（秒）"""
+    times = []
+    for i in range(launches):
+        profile_path = tempfile.mkdtemp(prefix=f"bench_{name}_{i}_")
+        try:
+            started = time.perf_counter()
+            browser = launch(profile_path)
+            times.append(time.perf_counter() - started)
+            browser.quit()
+        finally:
+            shutil.rmtree(profile_path, ignore_errors=True)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器启动开销测试")
+    parser.add_argument("--launches", type=int, default=5)
+    parser.add_argument("--driver-version")
+    args = parser.parse_args()
+
+    # 先解析一次驱动路径，写入缓存；同时记下本进程的Chrome版本，cached 的结果不包含版本查询耗时
+    resolve_driver_path(args.driver_version)
+
+    cached_manager = BrowserManager(driver_version=args.driver_version)
+    shared_service = SharedDriverService(driver_version=args.driver_version)
+    shared_service.start()
+    shared_manager = BrowserManager(driver_service=shared_service)
+
+    def launch_with(manager):
+        return lambda profile_path: webdriver.Chrome(service=manager.create_service(), options=make_options(profile_path))
+
+    try:
+        results = {
+            "default": measure("default", launch_default, args.launches),
+            "cached": measure("cached", launch_with(cached_manager), args.launches),
+            "shared": measure("shared", launch_with(shared_manager), args.launches),
+        }
+    finally:
+        shared_service.shutdown()
+
+    baseline = sum(results["default"]) / len(results["default"])
+    for name, times in results.items():
+        average = sum(times) / len(times)
+        print(f"{name:8s} 平均 {average * 1000:7.0f}ms  最短 {min(times) * 1000:7.0f}ms  "
+              f"相对修改前 {(average - baseline) * 1000:+.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""GUI启动耗时测试：测量从启动解释器到主窗口首次显示的时间
+
+用法:
+    python benchmarks/startup_benchmark.py --budget 1.0 --profiles 1000
+
+在新的子进程中启动，避免已导入的模块影响结果。超过预算，或selenium等依赖
+出现在GUI的导入链中时，返回非0退出码。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 不允许出现在GUI启动导入链中的模块
+FORBIDDEN_MODULES = ("selenium", "webdriver_manager", "requests", "bs4", "psutil", "core.browser")
+
+CHILD_SCRIPT = r'''
+import sys
+import time
+import json
+from datetime import datetime
+start = time.perf_counter()
+
+from gui.main_window import MainWindow
+
+class BenchConfig:
+    """只提供界面需要的 config 属性"""
+    def __init__(self, count):
+        self.config = {"profiles": {
+            f"profile{i}": {"profile_path": f"/tmp/profile{i}", "created_at": str(datetime.now())}
+            for i in range(count)
+        }}
+
+window = MainWindow(BenchConfig(int(sys.argv[1])))
+imported = time.perf_counter()
+
+while not window.first_paint_done:
+    window.root.update()
+shown = time.perf_counter()
+
+while window.status_var.get() != "就绪" or not window.profile_tree.get_children():
+    window.root.update()
+loaded = time.perf_counter()
+
+window.root.destroy()
+print(json.dumps({
+    "import": imported - start,
+    "window": shown - start,
+    "profiles": loaded - start,
+    "modules": sorted(sys.modules),
+}))
+'''
+
+
+def run_once(profile_count):
+    """在子进程中启动一次，返回耗时和已导入模块"""
+    started = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, str(profile_count)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if started.returncode != 0:
+        raise RuntimeError(started.stderr.strip())
+    return json.loads(started.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI启动耗时测试")
+    parser.add_argument("--budget", type=float, default=1.0, help="窗口显示耗时预算（秒）")
+    parser.add_argument("--profiles", type=int, default=1000, help="测试用配置数量")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        results = [run_once(args.profiles) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"启动失败（需要图形界面环境）: {e}")
+        return 2
+
+    window_times = sorted(r["window"] for r in results)
+    median = window_times[len(window_times) // 2]
+    print(f"导入+创建窗口: {min(r['import'] for r in results) * 1000:.0f}ms")
+    print(f"窗口显示(中位数): {median * 1000:.0f}ms  预算: {args.budget * 1000:.0f}ms")
+    print(f"配置列表加载完成({args.profiles}个): {min(r['profiles'] for r in results) * 1000:.0f}ms")
+
+    leaked = [m for m in results[0]["modules"] if m.split(".")[0] in FORBIDDEN_MODULES or m in FORBIDDEN_MODULES]
+    if leaked:
+        print(f"GUI导入链中出现了不应加载的模块: {', '.join(leaked)}")
+        return 1
+    if median > args.budget:
+        print("超出启动耗时预算")
+        return 1
+    print("通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,141 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, SessionNotCreatedException
+
+from core.driver_service import is_version_mismatch, resolve_driver_path
+from core.network_capture import NetworkCapture
+from core.page_cache import PAGE_TYPES
 
 class BrowserManager:
-    def __init__(self):
+    def __init__(self, governor=None, driver_service=None, driver_version=None):
         self.active_browsers = {}
+        self.network_captures = {}
+        self.profile_paths = {}
+        self.governor = governor  # ResourceGovernor，可选
+        self.driver_service = driver_service  # SharedDriverService，可选，所有浏览器共用一个chromedriver
+        self.driver_version = driver_version  # 固定chromedriver版本，None时使用缓存的最新版本
+        self.driver_path = None
+    
+    def create_service(self, refresh=False):
+        """获取chromedriver服务：共享服务，或使用缓存驱动路径的独立服务
+        
+        refresh为True时丢弃缓存的驱动并重新获取（驱动与已升级的Chrome不匹配时）。
+        """
+        if self.driver_service:
+            if refresh:
+                self.driver_service.refresh()
+            return self.driver_service.service
+        if self.driver_path is None or refresh:
+            self.driver_path = resolve_driver_path(self.driver_version, refresh=refresh)
+        return Service(executable_path=self.driver_path)
     
-    def launch_browser(self, profile_name, profile_path):
-        """启动指定配置的浏览器"""
+    def launch_browser(self, profile_name, profile_path, capture_network=False):
+        """启动指定配置的浏览器
+        
+        capture_network为True时启用DevTools网络事件捕获，页面数据从网络响应中解析，
+        不等待页面渲染完成。捕获对象可通过 get_network_capture 获取。
+        """
+        if self.governor:
+            self.governor.wait_for_capacity()
+        
         options = Options()
         options.add_argument(f"user-data-dir={profile_path}")
+        if capture_network:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            options.page_load_strategy = "eager"
         
-        browser = webdriver.Chrome(options=options)
+        try:
+            browser = webdriver.Chrome(service=self.create_service(), options=options)
+        except SessionNotCreatedException as e:
+            # 只有Chrome自动升级后驱动版本不匹配时才重新获取驱动并重试一次，其他错误（如配置目录被占用）直接抛出
+            if not is_version_mismatch(e):
+                raise
+            print(f"chromedriver与Chrome版本不匹配，重新获取chromedriver: {str(e).splitlines()[0] if str(e) else ''}")
+            browser = webdriver.Chrome(service=self.create_service(refresh=True), options=options)
         self.active_browsers[profile_name] = browser
+        self.profile_paths[profile_name] = profile_path
+        if self.governor:
+            self.governor.register(profile_name, browser, profile_path)
+        if capture_network:
+            self.network_captures[profile_name] = NetworkCapture(browser)
         return browser
     
+    def record_page(self, profile_name):
+        """记录一次页面访问，用于按页面数回收浏览器"""
+        if self.governor:
+            self.governor.record_page(profile_name)
+    
+    def recycle_browser_if_needed(self, profile_name):
+        """页面数或内存超过阈值时重启浏览器，返回当前可用的浏览器"""
+        browser = self.active_browsers.get(profile_name)
+        if browser is None or not self.governor or not self.governor.should_recycle(profile_name):
+            return browser
+        
+        profile_path = self.profile_paths[profile_name]
+        capture_network = profile_name in self.network_captures
+        self.close_browser(profile_name)
+        return self.launch_browser(profile_name, profile_path, capture_network)
+    
+    def get_network_capture(self, profile_name):
+        """获取指定浏览器的网络捕获对象，未启用时返回None"""
+        return self.network_captures.get(profile_name)
+    
     def close_browser(self, profile_name):
         """关闭指定的浏览器"""
         if profile_name in self.active_browsers:
-            self.active_browsers[profile_name].quit()
-            del self.active_browsers[profile_name] 
+            # quit 会先结束 chromedriver，之后无法再找到它的子进程，因此先记录进程树
+            snapshot = self.governor.snapshot(profile_name) if self.governor else []
+            try:
+                self.active_browsers[profile_name].quit()
+            except Exception as e:
+                print(f"关闭浏览器时发生错误: {str(e)}")
+            del self.active_browsers[profile_name]
+            self.network_captures.pop(profile_name, None)
+            self.profile_paths.pop(profile_name, None)
+            # 结束 quit 后仍残留的 chromedriver/Chrome 进程
+            if self.governor:
+                self.governor.unregister(profile_name, snapshot)
+    
+    def close_all(self):
+        """关闭所有浏览器"""
+        for profile_name in list(self.active_browsers):
+            self.close_browser(profile_name)
 
 class YahooAuctionManager:
-    def __init__(self, browser):
+    def __init__(self, browser, page_cache=None, network_capture=None, browser_manager=None, profile_name=None):
         self.browser = browser
+        self.page_cache = page_cache  # ParsedPageCache，可选
+        self.network_capture = network_capture  # NetworkCapture，可选
+        # 传入 BrowserManager 时，每次跳转都会记录页面数并按需重启浏览器
+        self.browser_manager = browser_manager
+        self.profile_name = profile_name
         self.base_url = "https://auctions.yahoo.co.jp/closeduser/jp/show/mystatus"
     
+    def open_page(self, url):
+        """跳转页面；超过页面数或内存阈值时先重启浏览器"""
+        if self.browser_manager:
+            browser = self.browser_manager.recycle_browser_if_needed(self.profile_name)
+            if browser is not None and browser is not self.browser:
+                # 浏览器已重启，改用新的浏览器和网络捕获对象
+                self.browser = browser
+                self.network_capture = self.browser_manager.get_network_capture(self.profile_name)
+        
+        self.browser.get(url)
+        if self.browser_manager:
+            self.browser_manager.record_page(self.profile_name)
+    
     def go_to_won_auctions(self):
         """访问已中标的商品页面"""
         try:
+            if self.network_capture:
+                self.network_capture.clear("won_list")
+            
             # 访问已中标页面
-            self.browser.get(f"{self.base_url}?select=won")
+            self.open_page(f"{self.base_url}?select=won")
             
             # 等待页面加载完成
             wait = WebDriverWait(self.browser, 10)
@@ -48,6 +150,14 @@ class YahooAuctionManager:
                 print("页面跳转失败")
                 return False
             
+            # 网络捕获模式下以响应数据为准，不等待页面元素
+            if self.network_capture:
+                if self.network_capture.wait_for("won_list") is None:
+                    print("未捕获到已中标页面的响应")
+                    return False
+                print("页面加载成功")
+                return True
+            
             try:
                 # 等待商品表格
                 table_element = wait.until(
@@ -94,6 +204,13 @@ class YahooAuctionManager:
     
     def get_won_items(self):
         """获取已中标商品列表"""
+        if self.network_capture:
+            items = self.network_capture.wait_for("won_list")
+            if items is not None:
+                if self.page_cache:
+                    self.page_cache.sync_won_items(items)
+                return items
+        
         try:
             # 等待商品列表加载
             items_table = WebDriverWait(self.browser, 10).until(
@@ -127,6 +244,10 @@ class YahooAuctionManager:
                     print(f"解析商品行时发生错误: {str(e)}")
                     continue
             
+            # 状态变化的商品，其页面缓存失效
+            if self.page_cache:
+                self.page_cache.sync_won_items(items)
+            
             return items
             
         except TimeoutException:
@@ -136,6 +257,35 @@ class YahooAuctionManager:
             print(f"获取商品列表时发生错误: {str(e)}")
             return []
 
+    def get_item_page(self, item_id, page_type, url, parse_page):
+        """获取商品页面（详情/交易/收货地址）的解析结果
+        
+        parse_page(browser) 负责从当前页面解析出字段字典。
+        有缓存时直接返回缓存内容，跳过页面跳转。
+        """
+        if page_type not in PAGE_TYPES:
+            print(f"未知的页面类型: {page_type}")
+            return None
+        
+        if self.page_cache:
+            fields = self.page_cache.get(item_id, page_type)
+            if fields is not None:
+                return fields
+        
+        try:
+            self.open_page(url)
+            fields = parse_page(self.browser)
+        except TimeoutException:
+            print(f"加载商品页面超时: {url}")
+            return None
+        except Exception as e:
+            print(f"解析商品页面时发生错误: {str(e)}")
+            return None
+        
+        if self.page_cache and fields is not None:
+            self.page_cache.set(item_id, page_type, fields)
+        return fields
+
 # 使用示例
 def test_yahoo_auction():
     # 创建浏览器管理器
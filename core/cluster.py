@@ -0,0 +1,524 @@
+"""多机协作模式：协调器分发配置任务，工作机执行并回传结果
+
+用法（同一台机器上测试时，可以直接用 local 子命令）:
+    python -m core.cluster coordinator --host 0.0.0.0 --port 50050 --authkey <密钥>
+    YAHUOKU_AUTHKEY=<密钥> python -m core.cluster worker --host 192.168.1.10 --port 50050
+    python -m core.cluster local --workers 3 --dry-run
+"""
+import argparse
+import csv
+import functools
+import ipaddress
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from multiprocessing.managers import BaseManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50050
+AUTHKEY_ENV = "YAHUOKU_AUTHKEY"  # 未指定 --authkey 时从该环境变量读取
+LEASE_SECONDS = 60          # 租约有效期，超时未心跳视为工作机已失联
+HEARTBEAT_INTERVAL = 15     # 工作机发送心跳的间隔
+MAX_ATTEMPTS = 3            # 单个任务最多分配次数
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULT_FIELDS = [
+    "profile_name", "item_id", "title", "price", "end_time", "status", "url",
+    "success", "message", "worker_id", "finished_at",
+]
+
+
+class JobCoordinator:
+    """配置任务队列，负责租约、心跳与失联工作机的任务重新分配"""
+
+    def __init__(self, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, result_file=None):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_file = result_file
+        self.lock = threading.Lock()
+        self.jobs = {}       # job_id -> 任务信息
+        self.pending = []    # 等待分配的 job_id
+        self.leases = {}     # job_id -> {"worker_id", "expires_at"}
+        self.results = {}    # job_id -> 已回传的商品列表
+        self.finished = {}   # job_id -> 完成状态
+        self.workers = {}    # worker_id -> 最后一次心跳时间
+        self.worker_profiles = {}  # worker_id -> 该工作机本地拥有的配置名称
+
+    def add_job(self, profile_name):
+        """添加一个配置任务；配置路径由工作机根据本地配置查找"""
+        with self.lock:
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "profile_name": profile_name,
+                "attempts": 0,
+            }
+            self.pending.append(job_id)
+            return job_id
+
+    def lease_job(self, worker_id, profile_names):
+        """为工作机分配一个它本地拥有的配置任务，没有可分配任务时返回None"""
+        with self.lock:
+            self.workers[worker_id] = time.time()
+            self.worker_profiles[worker_id] = set(profile_names)
+            job_id = next(
+                (job_id for job_id in self.pending if self.jobs[job_id]["profile_name"] in profile_names),
+                None,
+            )
+            if job_id is None:
+                return None
+
+            self.pending.remove(job_id)
+            job = self.jobs[job_id]
+            job["attempts"] += 1
+            self.leases[job_id] = {
+                "worker_id": worker_id,
+                "expires_at": time.time() + self.lease_seconds,
+            }
+            self.results[job_id] = []
+            print(f"分配任务 {job['profile_name']} -> {worker_id} (第{job['attempts']}次)")
+            # 附带租约时长，工作机据此决定心跳间隔
+            return dict(job, lease_seconds=self.lease_seconds)
+
+    def heartbeat(self, worker_id, job_id=None):
+        """续约；返回False表示租约已失效，工作机应放弃该任务"""
+        with self.lock:
+            self.workers[worker_id] = time.time()
+            if job_id is None:
+                return True
+            if not self._owns_lease(worker_id, job_id):
+                return False
+            self.leases[job_id]["expires_at"] = time.time() + self.lease_seconds
+            return True
+
+    def report_item(self, worker_id, job_id, item):
+        """工作机逐条回传订单结果"""
+        with self.lock:
+            if not self._owns_lease(worker_id, job_id):
+                return False
+            self.results[job_id].append(dict(item))
+            self.leases[job_id]["expires_at"] = time.time() + self.lease_seconds
+            return True
+
+    def complete_job(self, worker_id, job_id, success, message=""):
+        """工作机报告任务完成"""
+        with self.lock:
+            if not self._owns_lease(worker_id, job_id):
+                return False
+            del self.leases[job_id]
+            self._finish(job_id, worker_id, success, message)
+            return True
+
+    def reap_expired(self):
+        """回收过期租约，重新放回队列或标记为失败"""
+        now = time.time()
+        with self.lock:
+            expired = [job_id for job_id, lease in self.leases.items() if lease["expires_at"] < now]
+            for job_id in expired:
+                lease = self.leases.pop(job_id)
+                job = self.jobs[job_id]
+                # 丢弃失联工作机回传的部分结果，避免重复
+                self.results[job_id] = []
+                if job["attempts"] >= self.max_attempts:
+                    print(f"任务 {job['profile_name']} 已达到最大尝试次数，标记为失败")
+                    self._finish(job_id, lease["worker_id"], False, "工作机失联")
+                else:
+                    print(f"工作机 {lease['worker_id']} 失联，重新分配任务 {job['profile_name']}")
+                    self.pending.append(job_id)
+            return len(expired)
+
+    def is_done(self):
+        """所有任务是否均已完成"""
+        with self.lock:
+            return bool(self.jobs) and len(self.finished) == len(self.jobs)
+
+    def get_summary(self):
+        """获取任务状态汇总"""
+        with self.lock:
+            return {
+                "total": len(self.jobs),
+                "pending": len(self.pending),
+                "running": len(self.leases),
+                "finished": len(self.finished),
+                "failed": sum(1 for f in self.finished.values() if not f["success"]),
+                "workers": len(self.workers),
+                # 已连接的工作机都没有的配置，需要在拥有该配置的机器上启动工作机
+                "unclaimed": sorted({
+                    self.jobs[job_id]["profile_name"] for job_id in self.pending
+                    if not any(self.jobs[job_id]["profile_name"] in names for names in self.worker_profiles.values())
+                }),
+            }
+
+    def _owns_lease(self, worker_id, job_id):
+        lease = self.leases.get(job_id)
+        return lease is not None and lease["worker_id"] == worker_id
+
+    def _finish(self, job_id, worker_id, success, message):
+        job = self.jobs[job_id]
+        self.finished[job_id] = {
+            "success": success,
+            "message": message,
+            "worker_id": worker_id,
+            "finished_at": str(datetime.now()),
+        }
+        status = "成功" if success else f"失败: {message}"
+        print(f"任务 {job['profile_name']} 完成 ({worker_id}) {status}，共 {len(self.results[job_id])} 条")
+        if self.result_file:
+            self._write_results(job_id)
+
+    def _write_results(self, job_id):
+        """将任务结果追加写入CSV"""
+        job = self.jobs[job_id]
+        finished = self.finished[job_id]
+        rows = self.results[job_id] or [{}]
+        write_header = not os.path.exists(self.result_file)
+        try:
+            with open(self.result_file, "a", newline="", encoding="utf-8-sig") as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+                if write_header:
+                    writer.writeheader()
+                for item in rows:
+                    row = dict(item)
+                    row.update(profile_name=job["profile_name"], **finished)
+                    writer.writerow(row)
+        except Exception as e:
+            print(f"写入结果文件时发生错误: {str(e)}")
+
+
+class CoordinatorServer(BaseManager):
+    pass
+
+
+class CoordinatorClient(BaseManager):
+    pass
+
+
+CoordinatorClient.register("get_coordinator")
+
+
+def is_loopback(host):
+    """是否为仅本机可访问的地址"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve_coordinator(coordinator, authkey, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """在后台线程中启动局域网队列服务"""
+    CoordinatorServer.register("get_coordinator", callable=lambda: coordinator)
+    manager = CoordinatorServer(address=(host, port), authkey=authkey.encode())
+    server = manager.get_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"协调器已启动: {host}:{port}")
+    return server
+
+
+def run_coordinator(coordinator, poll_interval=1.0):
+    """回收过期租约，直到所有任务完成"""
+    unclaimed = []
+    while not coordinator.is_done():
+        coordinator.reap_expired()
+        summary = coordinator.get_summary()
+        if summary["unclaimed"] != unclaimed and summary["workers"]:
+            unclaimed = summary["unclaimed"]
+            if unclaimed:
+                print(f"以下配置没有工作机拥有，等待对应机器上的工作机连接: {', '.join(unclaimed)}")
+        time.sleep(poll_interval)
+    print(f"所有任务已完成: {coordinator.get_summary()}")
+
+
+def connect_coordinator(authkey, host=DEFAULT_HOST, port=DEFAULT_PORT, retries=10):
+    """连接协调器，返回协调器代理对象"""
+    client = CoordinatorClient(address=(host, port), authkey=authkey.encode())
+    for attempt in range(retries):
+        try:
+            client.connect()
+            return client.get_coordinator()
+        except ConnectionRefusedError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(1)
+
+
+def run_profile(profile_name, profile_path, report, governor=None, driver_service=None, page_cache=None,
+                capture_network=False):
+    """在本机执行单个配置的自动化脚本，逐条回传商品"""
+    from core.browser import BrowserManager, YahooAuctionManager
+
+    browser_manager = BrowserManager(governor, driver_service)
+    auction_manager = None
+    try:
+        browser = browser_manager.launch_browser(profile_name, profile_path, capture_network)
+        auction_manager = YahooAuctionManager(
+            browser, page_cache, browser_manager.get_network_capture(profile_name),
+            browser_manager=browser_manager, profile_name=profile_name,
+        )
+        if not auction_manager.go_to_won_auctions():
+            return False, "访问已中标页面失败"
+        for item in auction_manager.get_won_items():
+            report(item)
+        return True, ""
+    finally:
+        # 网络捕获模式下输出页面跳转耗时，用于诊断
+        if auction_manager and auction_manager.network_capture:
+            auction_manager.network_capture.print_timings()
+        browser_manager.close_browser(profile_name)
+
+
+def run_profile_dry(profile_name, profile_path, report, governor=None, driver_service=None, page_cache=None,
+                    capture_network=False):
+    """不启动浏览器，仅模拟执行，用于在单机上测试协调流程"""
+    time.sleep(1)
+    report({"item_id": f"dry-{profile_name}", "title": "dry run", "status": "dry run"})
+    return True, ""
+
+
+class Worker:
+    """从协调器领取本机拥有的配置任务并执行"""
+
+    def __init__(self, coordinator, profiles, worker_id=None, runner=run_profile,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, governor=None, driver_service=None, page_cache=None,
+                 capture_network=False):
+        self.coordinator = coordinator
+        self.profiles = profiles  # 本机配置：名称 -> 路径
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.runner = functools.partial(
+            runner, governor=governor, driver_service=driver_service, page_cache=page_cache,
+            capture_network=capture_network,
+        )
+        self.heartbeat_interval = heartbeat_interval
+        self.governor = governor  # ResourceGovernor，可选
+        self.driver_service = driver_service  # SharedDriverService，可选
+        self.page_cache = page_cache  # ParsedPageCache，可选，跨任务和跨运行复用
+
+    def run(self, poll_interval=1):
+        """循环领取任务，直到协调器的所有任务完成或协调器退出"""
+        if self.governor:
+            self.governor.kill_orphans()
+        try:
+            self._run(poll_interval)
+        except (EOFError, ConnectionError) as e:
+            print(f"与协调器的连接已断开，工作机 {self.worker_id} 退出: {str(e)}")
+        finally:
+            if self.governor:
+                self.governor.shutdown()
+            if self.driver_service:
+                self.driver_service.shutdown()
+            if self.governor:
+                self.governor.kill_orphans()
+            if self.page_cache:
+                self.page_cache.save()
+
+    def _run(self, poll_interval):
+        while True:
+            job = self.coordinator.lease_job(self.worker_id, list(self.profiles))
+            if job is None:
+                # 其他工作机的任务仍可能因失联被重新分配，队列全部完成后才退出
+                if self.coordinator.is_done():
+                    print(f"所有任务已完成，工作机 {self.worker_id} 退出")
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            self.run_job(job)
+
+    def run_job(self, job):
+        """执行任务，执行期间在后台发送心跳"""
+        job_id = job["job_id"]
+        stop = threading.Event()
+        lost = threading.Event()
+        # 心跳间隔以协调器的租约时长为准，保证租约到期前至少续约数次
+        interval = min(self.heartbeat_interval, job["lease_seconds"] // 3 or 1)
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    if not self.coordinator.heartbeat(self.worker_id, job_id):
+                        lost.set()
+                        return
+                except Exception as e:
+                    print(f"发送心跳时发生错误: {str(e)}")
+
+        def report(item):
+            if not lost.is_set() and not self.coordinator.report_item(self.worker_id, job_id, item):
+                lost.set()
+
+        heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        heartbeat_thread.start()
+        print(f"工作机 {self.worker_id} 开始执行 {job['profile_name']}")
+        try:
+            profile_name = job["profile_name"]
+            success, message = self.runner(profile_name, self.profiles[profile_name], report)
+        except Exception as e:
+            success, message = False, str(e)
+        finally:
+            stop.set()
+            heartbeat_thread.join()
+
+        if lost.is_set():
+            print(f"任务 {job['profile_name']} 的租约已失效，结果已被丢弃")
+            return
+        self.coordinator.complete_job(self.worker_id, job_id, success, message)
+
+
+def acquire_slot(slot, max_slots=64):
+    """独占本机的工作机编号，编号已被占用时依次尝试下一个
+
+    对每个编号的锁文件加排他锁并在进程运行期间保持打开；进程退出（包括崩溃）时系统自动释放。
+    返回 (编号, 锁文件)，所有编号都被占用时返回 (None, None)。
+    """
+    for candidate in range(slot, slot + max_slots):
+        lock_path = os.path.join(tempfile.gettempdir(), f"yahuoku_{socket.gethostname()}_{candidate}.lock")
+        lock_file = open(lock_path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        if candidate != slot:
+            print(f"编号 {slot} 已被本机其他工作机占用，改用编号 {candidate}")
+        return candidate, lock_file
+    return None, None
+
+
+def load_profiles(profile_args):
+    """从命令行参数或本机配置文件读取配置列表（名称 -> 路径）"""
+    if profile_args:
+        profiles = {}
+        for arg in profile_args:
+            name, _, path = arg.partition("=")
+            profiles[name] = path
+        return profiles
+
+    from config.config_manager import ConfigManager
+    config = ConfigManager().config.get("profiles", {})
+    return {name: info.get("profile_path", "") for name, info in config.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yahoo Auction Manager 多机模式")
+    parser.add_argument("mode", choices=["coordinator", "worker", "local"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--authkey", help=f"协调器与工作机的共享密钥，也可通过环境变量 {AUTHKEY_ENV} 指定")
+    parser.add_argument("--profile", action="append",
+                        help="name=path（协调器只使用名称），不指定时读取本机配置文件")
+    parser.add_argument("--output", default="results.csv", help="协调器结果CSV文件")
+    parser.add_argument("--lease", type=int, default=LEASE_SECONDS, help="协调器的任务租约秒数，工作机据此决定心跳间隔")
+    parser.add_argument("--workers", type=int, default=2, help="local模式下启动的工作进程数")
+    parser.add_argument("--worker-id")
+    parser.add_argument("--slot", type=int, default=1, help="工作机编号，用于区分本机的进程记录和页面缓存；已被占用时自动使用下一个空闲编号")
+    parser.add_argument("--dry-run", action="store_true", help="不启动浏览器，仅测试协调流程")
+    parser.add_argument("--shared-driver", action="store_true", help="工作机内所有浏览器共用一个chromedriver")
+    parser.add_argument("--driver-version", help="固定chromedriver版本")
+    parser.add_argument("--capture-network", action="store_true", help="通过DevTools网络事件获取页面数据并输出页面耗时")
+    parser.add_argument("--page-cache", help="页面解析缓存文件，默认按主机和编号保存在临时目录")
+    args = parser.parse_args(argv)
+    # 队列服务会反序列化客户端发送的数据，必须使用不公开的密钥
+    authkey = args.authkey or os.environ.get(AUTHKEY_ENV)
+
+    if args.mode == "worker":
+        profiles = load_profiles(args.profile)
+        if not profiles:
+            print("本机没有可执行的配置")
+            return
+        if not authkey:
+            parser.error(f"工作机需要通过 --authkey 或环境变量 {AUTHKEY_ENV} 指定协调器的密钥")
+        # 进程记录和页面缓存按编号区分，同一编号只能由一个工作机使用
+        slot, slot_lock = acquire_slot(args.slot)
+        if slot is None:
+            print("没有可用的工作机编号")
+            return
+        coordinator = connect_coordinator(authkey, args.host, args.port)
+        worker_id = args.worker_id or f"{socket.gethostname()}-{slot}"
+        driver_service = None
+        page_cache = None
+        if args.dry_run:
+            runner, governor = run_profile_dry, None
+        else:
+            from core.page_cache import ParsedPageCache
+            cache_file = args.page_cache or os.path.join(
+                tempfile.gettempdir(), f"yahuoku_{socket.gethostname()}_{slot}_pages.json"
+            )
+            page_cache = ParsedPageCache(cache_file=cache_file)
+            from core.resource_governor import ResourceGovernor
+            # 按主机和编号固定文件名，重启后才能找到上次崩溃残留的进程
+            pid_file = os.path.join(tempfile.gettempdir(), f"yahuoku_{socket.gethostname()}_{slot}_drivers.json")
+            runner, governor = run_profile, ResourceGovernor(pid_file=pid_file)
+            if args.shared_driver:
+                from core.driver_service import SharedDriverService
+                driver_service = SharedDriverService(driver_version=args.driver_version)
+        Worker(
+            coordinator, profiles, worker_id, runner, HEARTBEAT_INTERVAL, governor, driver_service, page_cache,
+            args.capture_network,
+        ).run()
+        slot_lock.close()
+        return
+
+    coordinator = JobCoordinator(lease_seconds=args.lease, result_file=args.output)
+    for name in load_profiles(args.profile):
+        coordinator.add_job(name)
+    if not coordinator.jobs:
+        print("没有可执行的配置")
+        return
+
+    if not authkey:
+        if args.mode == "coordinator" and not is_loopback(args.host):
+            parser.error(f"监听非本机地址时必须通过 --authkey 或环境变量 {AUTHKEY_ENV} 指定密钥")
+        authkey = secrets.token_hex(16)
+        if args.mode == "coordinator":
+            print(f"已生成密钥，启动工作机时请通过 {AUTHKEY_ENV} 环境变量传入: {authkey}")
+    serve_coordinator(coordinator, authkey, args.host, args.port)
+
+    processes = []
+    if args.mode == "local":
+        # 在本机以子进程方式启动多个工作机（可用内存不足时，由各工作机在启动浏览器前等待）
+        for i in range(args.workers):
+            cmd = [
+                sys.executable, "-m", "core.cluster", "worker",
+                "--host", args.host, "--port", str(args.port),
+                "--worker-id", f"local-{i + 1}", "--slot", str(i + 1),
+            ]
+            for profile in args.profile or []:
+                cmd += ["--profile", profile]
+            if args.dry_run:
+                cmd.append("--dry-run")
+            if args.shared_driver:
+                cmd.append("--shared-driver")
+            if args.capture_network:
+                cmd.append("--capture-network")
+            if args.driver_version:
+                cmd += ["--driver-version", args.driver_version]
+            if args.page_cache:
+                cmd += ["--page-cache", f"{args.page_cache}.{i + 1}"]
+            # 密钥通过环境变量传给子进程，不出现在命令行参数中
+            env = dict(os.environ, **{AUTHKEY_ENV: authkey})
+            processes.append(subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env))
+
+    try:
+        run_coordinator(coordinator)
+    finally:
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from selenium.webdriver.chrome.service import Service
+
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".yahuoku_auto", "driver_cache.json")
+
+# chromedriver 与 Chrome 版本不匹配时的错误信息，例如
+# "This version of ChromeDriver only supports Chrome version 114 / Current browser version is 120..."
+VERSION_MISMATCH_MESSAGES = ("only supports chrome version", "current browser version is")
+
+_chrome_versions = {}  # 本进程内读取到的Chrome主版本号，避免每次启动浏览器都查询（Windows上需要调用PowerShell）
+
+
+def get_chrome_major_version():
+    """读取本机安装的Chrome主版本号（不访问网络），无法获取时返回None"""
+    try:
+        from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+        version = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception as e:
+        print(f"获取Chrome版本时发生错误: {str(e)}")
+        return None
+    return version.split(".")[0] if version else None
+
+
+def is_version_mismatch(error):
+    """会话创建失败是否由驱动与浏览器版本不匹配引起"""
+    message = str(error).lower()
+    return any(text in message for text in VERSION_MISMATCH_MESSAGES)
+
+
+def _cache_key(driver_version, refresh=False):
+    """固定版本时按驱动版本缓存，否则按本机Chrome主版本缓存，Chrome升级后自动重新获取驱动
+
+    Chrome版本每个进程只读取一次；refresh 为True时（运行中Chrome已升级）重新读取。
+    """
+    if driver_version:
+        return driver_version
+    if refresh or "major" not in _chrome_versions:
+        _chrome_versions["major"] = get_chrome_major_version()
+    chrome_version = _chrome_versions["major"]
+    return f"chrome-{chrome_version}" if chrome_version else "latest"
+
+
+def resolve_driver_path(driver_version=None, cache_file=DRIVER_CACHE_FILE, refresh=False):
+    """获取chromedriver路径，优先使用本地缓存，不访问网络
+
+    缓存按固定的驱动版本记录；未固定版本时按本机Chrome主版本记录。缓存不存在、
+    文件已被删除或 refresh 为True时才通过 webdriver-manager 下载；下载失败（如离线环境）
+    时继续使用缓存的驱动，没有缓存则返回None，由selenium自行查找驱动。
+    """
+    key = _cache_key(driver_version, refresh)
+    cache = _load_cache(cache_file)
+    entry = cache.get(key)
+    if not refresh and entry and os.path.isfile(entry.get("path", "")):
+        return entry["path"]
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager(driver_version=driver_version).install()
+    except Exception as e:
+        print(f"获取chromedriver失败: {str(e)}")
+        # 下载失败不代表缓存的驱动不可用，保留缓存记录
+        if entry and os.path.isfile(entry.get("path", "")):
+            return entry["path"]
+        return None
+
+    cache[key] = {"path": path, "resolved_at": str(datetime.now())}
+    _save_cache(cache_file, cache)
+    return path
+
+
+def _load_cache(cache_file):
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"读取驱动缓存时发生错误: {str(e)}")
+        return {}
+
+
+def _save_cache(cache_file, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"保存驱动缓存时发生错误: {str(e)}")
+
+
+class SharedService(Service):
+    """可被多个浏览器会话共用的chromedriver服务
+
+    只在第一次 start 时启动进程；浏览器 quit 时不停止服务，需调用 shutdown 结束。
+    """
+
+    shared = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        with self.lock:
+            if self.running and self.process.poll() is None:
+                return
+            super().start()
+            self.running = True
+
+    def stop(self):
+        """会话结束时不停止共享服务"""
+
+    def shutdown(self):
+        """停止chromedriver进程"""
+        with self.lock:
+            if self.running:
+                super().stop()
+                self.running = False
+
+
+class SharedDriverService:
+    """管理一个长期运行的chromedriver，所有浏览器会话连接到同一进程"""
+
+    def __init__(self, driver_path=None, driver_version=None):
+        self.driver_version = driver_version
+        self.driver_path = driver_path or resolve_driver_path(driver_version)
+        self.service = SharedService(executable_path=self.driver_path)
+        self.retired_services = []
+
+    def refresh(self):
+        """驱动与浏览器版本不匹配时，重新获取驱动并改用新的服务
+
+        旧服务继续为已有会话提供服务，直到 shutdown。
+        """
+        self.retired_services.append(self.service)
+        self.driver_path = resolve_driver_path(self.driver_version, refresh=True)
+        self.service = SharedService(executable_path=self.driver_path)
+
+    def start(self):
+        """启动chromedriver（已启动时不做任何操作）"""
+        self.service.start()
+        return self.service.service_url
+
+    def shutdown(self):
+        """停止chromedriver"""
+        for service in self.retired_services + [self.service]:
+            service.shutdown()
+        self.retired_services = []
@@ -0,0 +1,230 @@
+import base64
+import json
+import re
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# 需要拦截的页面：页面类型 -> URL规则
+CAPTURE_RULES = {
+    "won_list": re.compile(r"auctions\.yahoo\.co\.jp/closeduser/jp/show/mystatus.*select=won"),
+}
+
+CAPTURE_MIME_TYPES = ("text/html", "application/json")
+MAX_TRACKED_REQUESTS = 200  # 未完成请求的最大跟踪数，超出时丢弃最早的
+
+
+class _ItemTableParser(HTMLParser):
+    """从已中标页面HTML中提取 ItemTable 的行"""
+
+    def __init__(self):
+        super().__init__()
+        self.table_depth = 0
+        self.rows = []
+        self.row = None
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            if self.table_depth:
+                self.table_depth += 1
+            elif "ItemTable" in (attrs.get("class") or "").split():
+                self.table_depth = 1
+            return
+        if not self.table_depth:
+            return
+        if tag == "tr":
+            self.row = []
+        elif tag == "td" and self.row is not None:
+            self.cell = {"text": [], "href": ""}
+            self.row.append(self.cell)
+        elif tag == "a" and self.cell is not None and not self.cell["href"]:
+            self.cell["href"] = attrs.get("href") or ""
+
+    def handle_endtag(self, tag):
+        if not self.table_depth:
+            return
+        if tag == "table":
+            self.table_depth -= 1
+        elif tag == "td":
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self.rows.append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell["text"].append(data)
+
+
+def parse_won_list(body, url):
+    """解析已中标页面HTML，返回与 get_won_items 相同格式的商品列表"""
+    parser = _ItemTableParser()
+    parser.feed(body)
+
+    items = []
+    for row in parser.rows[1:]:  # 跳过表头
+        if len(row) < 6:
+            continue
+        texts = [" ".join("".join(cell["text"]).split()) for cell in row]
+        items.append({
+            "item_id": texts[1],
+            "title": texts[2],
+            "price": texts[3],
+            "end_time": texts[4],
+            "status": texts[5],
+            "url": urljoin(url, row[2]["href"]) if row[2]["href"] else "",
+        })
+    return items
+
+
+PARSERS = {
+    "won_list": parse_won_list,
+}
+
+
+class NetworkCapture:
+    """通过 Chrome DevTools Protocol 的网络事件获取页面数据，不依赖页面渲染
+
+    需要浏览器启用 performance 日志（见 BrowserManager.launch_browser 的 capture_network 参数）。
+    """
+
+    def __init__(self, browser, rules=None, parsers=None):
+        self.browser = browser
+        self.rules = rules or CAPTURE_RULES
+        self.parsers = parsers or PARSERS
+        self.pending = OrderedDict()   # requestId -> 等待加载完成的响应
+        self.requests = OrderedDict()  # requestId -> 页面请求的开始信息
+        self.results = {}     # 页面类型 -> 解析结果列表
+        self.timings = []     # 页面跳转耗时记录
+
+        self.browser.execute_cdp_cmd("Network.enable", {})
+
+    def clear(self, page_type=None):
+        """清除已捕获的结果；先读取未处理的网络事件，避免之前的页面数据在清除后才被解析"""
+        self.poll()
+        if page_type is None:
+            self.results.clear()
+        else:
+            self.results.pop(page_type, None)
+
+    def poll(self):
+        """读取并处理新的网络事件"""
+        try:
+            entries = self.browser.get_log("performance")
+        except Exception as e:
+            print(f"读取网络日志时发生错误: {str(e)}")
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                self._on_request(params)
+            elif method == "Network.responseReceived":
+                self._on_response(params)
+            elif method == "Network.loadingFinished":
+                self._on_finished(params)
+            elif method == "Network.loadingFailed":
+                self.pending.pop(params.get("requestId"), None)
+                self.requests.pop(params.get("requestId"), None)
+
+    def wait_for(self, page_type, timeout=10):
+        """等待指定类型页面的解析结果，超时返回None"""
+        deadline = time.time() + timeout
+        while True:
+            self.poll()
+            if self.results.get(page_type):
+                return self.results[page_type][-1]["data"]
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.1)
+
+    def get_results(self, page_type):
+        """获取指定类型页面的全部捕获结果"""
+        return list(self.results.get(page_type, []))
+
+    def get_timings(self):
+        """获取页面跳转耗时记录"""
+        return list(self.timings)
+
+    def print_timings(self):
+        """输出页面跳转耗时，用于诊断"""
+        for timing in self.timings:
+            response = timing.get("response_ms")
+            response_text = f"{response:.0f}ms" if response is not None else "-"
+            print(f"页面耗时 响应 {response_text} / 加载完成 {timing['finished_ms']:.0f}ms  {timing['url']}")
+
+    def _match(self, url):
+        for page_type, pattern in self.rules.items():
+            if pattern.search(url):
+                return page_type
+        return None
+
+    def _on_request(self, params):
+        if params.get("type") != "Document":
+            return
+        self.requests[params.get("requestId")] = {
+            "url": params.get("request", {}).get("url", ""),
+            "started": params.get("timestamp"),
+        }
+        _limit(self.requests)
+
+    def _on_response(self, params):
+        response = params.get("response", {})
+        url = response.get("url", "")
+        page_type = self._match(url)
+        if page_type is None:
+            return
+        if not response.get("mimeType", "").startswith(CAPTURE_MIME_TYPES):
+            return
+        self.pending[params.get("requestId")] = {
+            "page_type": page_type,
+            "url": url,
+            "status": response.get("status"),
+            "responded": params.get("timestamp"),
+        }
+        _limit(self.pending)
+
+    def _on_finished(self, params):
+        request_id = params.get("requestId")
+        request = self.requests.pop(request_id, None)
+        response = self.pending.pop(request_id, None)
+
+        finished = params.get("timestamp")
+        if request and request.get("started") is not None and finished is not None:
+            timing = {"url": request["url"], "finished_ms": (finished - request["started"]) * 1000}
+            if response and response.get("responded") is not None:
+                timing["response_ms"] = (response["responded"] - request["started"]) * 1000
+            self.timings.append(timing)
+
+        if response is None:
+            return
+        try:
+            result = self.browser.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+            data = self.parsers[response["page_type"]](body, response["url"])
+        except Exception as e:
+            print(f"解析网络响应时发生错误: {str(e)}")
+            return
+
+        self.results.setdefault(response["page_type"], []).append({
+            "url": response["url"],
+            "status": response["status"],
+            "data": data,
+        })
+
+
+def _limit(tracked):
+    """丢弃最早的未完成请求，避免无限增长"""
+    while len(tracked) > MAX_TRACKED_REQUESTS:
+        tracked.popitem(last=False)
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PAGE_TYPES = ("detail", "transaction", "address")
+
+
+class ParsedPageCache:
+    """缓存商品页面解析后的字段（不保存HTML），支持TTL过期和LRU淘汰
+
+    以 (item_id, 页面类型) 为键；商品在已中标列表中的状态变化时，该商品的所有缓存失效。
+    """
+
+    def __init__(self, max_size=500, ttl=24 * 3600, cache_file=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.lock = threading.RLock()
+        self.entries = OrderedDict()  # (item_id, page_type) -> {"fields", "stored_at"}
+        self.statuses = OrderedDict()  # item_id -> 最近一次看到的状态
+        self.hits = 0
+        self.misses = 0
+
+        if cache_file:
+            self.load()
+
+    def get(self, item_id, page_type):
+        """获取缓存的字段，未命中或已过期时返回None"""
+        key = (str(item_id), page_type)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry["stored_at"] > self.ttl:
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry["fields"])
+
+    def set(self, item_id, page_type, fields):
+        """保存解析后的字段"""
+        if page_type not in PAGE_TYPES:
+            raise ValueError(f"未知的页面类型: {page_type}")
+        key = (str(item_id), page_type)
+        with self.lock:
+            self.entries[key] = {"fields": dict(fields), "stored_at": time.time()}
+            self.entries.move_to_end(key)
+            self._trim()
+
+    def invalidate(self, item_id):
+        """删除指定商品的所有缓存"""
+        item_id = str(item_id)
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == item_id]:
+                del self.entries[key]
+
+    def sync_won_items(self, items):
+        """根据已中标列表更新商品状态，状态变化的商品缓存失效"""
+        changed = []
+        with self.lock:
+            for item in items:
+                item_id = str(item.get("item_id", ""))
+                if not item_id:
+                    continue
+                status = item.get("status", "")
+                previous = self.statuses.get(item_id)
+                if previous is not None and previous != status:
+                    self.invalidate(item_id)
+                    changed.append(item_id)
+                self.statuses[item_id] = status
+                self.statuses.move_to_end(item_id)
+            self._trim()
+        return changed
+
+    def _trim(self):
+        """按LRU淘汰超出容量的缓存和状态记录"""
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        # 状态记录同样限制数量；丢弃状态的商品无法再检测状态变化，其缓存一并失效
+        while len(self.statuses) > self.max_size:
+            item_id, _ = self.statuses.popitem(last=False)
+            self.invalidate(item_id)
+
+    def load(self):
+        """从缓存文件读取"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            with self.lock:
+                self.statuses = OrderedDict(data.get("statuses", {}))
+                for entry in data.get("entries", []):
+                    if now - entry["stored_at"] <= self.ttl:
+                        key = (entry["item_id"], entry["page_type"])
+                        self.entries[key] = {"fields": entry["fields"], "stored_at": entry["stored_at"]}
+                self._trim()
+        except Exception as e:
+            print(f"读取页面缓存时发生错误: {str(e)}")
+
+    def save(self):
+        """保存到缓存文件，供下次运行使用"""
+        if not self.cache_file:
+            return
+        with self.lock:
+            data = {
+                "statuses": dict(self.statuses),
+                "entries": [
+                    {"item_id": item_id, "page_type": page_type, **entry}
+                    for (item_id, page_type), entry in self.entries.items()
+                ],
+            }
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存页面缓存时发生错误: {str(e)}")
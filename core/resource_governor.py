@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+import time
+
+import psutil
+
+MAX_PAGES = 200            # 单个浏览器访问页面数超过该值后回收
+MAX_RSS_MB = 1500          # 单个浏览器进程树内存超过该值后回收
+MIN_FREE_MB = 1024         # 系统可用内存低于该值时暂停启动新的浏览器
+
+DRIVER_NAMES = ("chromedriver", "chromedriver.exe")
+CHROME_NAMES = ("chrome", "chrome.exe", "google-chrome", "chromium", "chromium-browser")
+
+
+class ResourceGovernor:
+    """跟踪每个 chromedriver 进程树的内存和CPU，按页面数或内存阈值回收浏览器
+
+    跟踪的进程号会记录在 pid_file 中，下次启动时用于清理崩溃后残留的进程。
+    """
+
+    def __init__(self, max_pages=MAX_PAGES, max_rss_mb=MAX_RSS_MB, min_free_mb=MIN_FREE_MB, pid_file=None):
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.min_free_mb = min_free_mb
+        self.pid_file = pid_file
+        self.lock = threading.Lock()
+        self.drivers = {}     # profile_name -> 进程树的根进程 (chromedriver 或共享模式下的 Chrome)
+        self.pages = {}       # profile_name -> 已访问页面数
+        self.processes = {}   # pid -> psutil.Process，用于计算CPU占用
+
+    def register(self, profile_name, browser, profile_path=None):
+        """登记新启动的浏览器"""
+        driver = psutil.Process(browser.service.process.pid)
+        if getattr(browser.service, "shared", False):
+            # 共享chromedriver时只跟踪该会话的Chrome进程树，避免回收时结束其他会话
+            driver = _find_browser_process(driver, profile_path)
+            if driver is None:
+                print(f"未找到 {profile_name} 的Chrome进程，无法跟踪资源占用")
+                return
+        with self.lock:
+            self.drivers[profile_name] = driver
+            self.pages[profile_name] = 0
+        self._save_pids()
+
+    def snapshot(self, profile_name):
+        """记录浏览器当前的整个进程树
+
+        quit() 会结束 chromedriver 根进程，之后无法再通过它找到子进程，需要在关闭前调用。
+        """
+        driver = self.drivers.get(profile_name)
+        return _process_tree(driver) if driver is not None else []
+
+    def unregister(self, profile_name, snapshot=None):
+        """注销浏览器，并结束残留的进程树及 snapshot 中仍在运行的进程"""
+        with self.lock:
+            driver = self.drivers.pop(profile_name, None)
+            self.pages.pop(profile_name, None)
+        processes = list(snapshot or [])
+        if driver is not None:
+            processes += _process_tree(driver)
+        killed = kill_processes(processes)
+        if killed:
+            print(f"已结束 {profile_name} 残留的 {killed} 个进程")
+        self._save_pids()
+
+    def record_page(self, profile_name):
+        """记录一次页面访问"""
+        with self.lock:
+            if profile_name in self.pages:
+                self.pages[profile_name] += 1
+
+    def get_usage(self, profile_name):
+        """获取浏览器进程树的内存(MB)、CPU占用和进程数"""
+        driver = self.drivers.get(profile_name)
+        if driver is None:
+            return None
+
+        rss = 0
+        cpu = 0.0
+        tree = _process_tree(driver)
+        with self.lock:
+            alive = set()
+            for process in tree:
+                try:
+                    process = self.processes.setdefault(process.pid, process)
+                    rss += process.memory_info().rss
+                    cpu += process.cpu_percent(None)
+                    alive.add(process.pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            for stale in [p for p in self.processes if p not in alive and not psutil.pid_exists(p)]:
+                del self.processes[stale]
+
+        return {
+            "rss_mb": rss / 1024 / 1024,
+            "cpu_percent": cpu,
+            "processes": len(tree),
+            "pages": self.pages.get(profile_name, 0),
+        }
+
+    def should_recycle(self, profile_name):
+        """是否需要重启该浏览器"""
+        usage = self.get_usage(profile_name)
+        if usage is None:
+            return False
+        if usage["pages"] >= self.max_pages:
+            print(f"{profile_name} 已访问 {usage['pages']} 个页面，需要重启浏览器")
+            return True
+        if usage["rss_mb"] >= self.max_rss_mb:
+            print(f"{profile_name} 内存占用 {usage['rss_mb']:.0f}MB，需要重启浏览器")
+            return True
+        return False
+
+    def has_capacity(self):
+        """系统可用内存是否足够启动新的浏览器"""
+        return psutil.virtual_memory().available / 1024 / 1024 >= self.min_free_mb
+
+    def wait_for_capacity(self, timeout=None, interval=5):
+        """等待系统可用内存恢复，超时返回False"""
+        deadline = None if timeout is None else time.time() + timeout
+        notified = False
+        while not self.has_capacity():
+            if not notified:
+                print("系统可用内存不足，等待释放...")
+                notified = True
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(interval)
+        return True
+
+    def kill_orphans(self):
+        """结束上次运行残留的 chromedriver 进程树，以及失去 chromedriver 的自动化 Chrome 进程"""
+        killed = 0
+        for pid in self._load_pids():
+            try:
+                process = psutil.Process(pid)
+                if process.name().lower() in DRIVER_NAMES + CHROME_NAMES:
+                    killed += kill_process_tree(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        for process in psutil.process_iter(["pid", "name", "cmdline"]):
+            try:
+                if (process.info["name"] or "").lower() not in CHROME_NAMES:
+                    continue
+                if "--enable-automation" not in (process.info["cmdline"] or []):
+                    continue
+                parent = process.parent()
+                if parent is None or parent.name().lower() not in DRIVER_NAMES + CHROME_NAMES:
+                    killed += kill_process_tree(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        if killed:
+            print(f"已清理 {killed} 个残留的浏览器进程")
+        self._save_pids()
+        return killed
+
+    def shutdown(self):
+        """结束所有登记的浏览器进程树"""
+        for profile_name in list(self.drivers):
+            self.unregister(profile_name)
+
+    def _load_pids(self):
+        if not self.pid_file or not os.path.exists(self.pid_file):
+            return []
+        try:
+            with open(self.pid_file, "r", encoding="utf-8") as f:
+                return [int(pid) for pid in json.load(f)]
+        except Exception as e:
+            print(f"读取进程记录时发生错误: {str(e)}")
+            return []
+
+    def _save_pids(self):
+        if not self.pid_file:
+            return
+        with self.lock:
+            pids = [driver.pid for driver in self.drivers.values()]
+        try:
+            with open(self.pid_file, "w", encoding="utf-8") as f:
+                json.dump(pids, f)
+        except Exception as e:
+            print(f"保存进程记录时发生错误: {str(e)}")
+
+
+def _find_browser_process(driver, profile_path):
+    """在chromedriver的子进程中查找使用指定配置目录的Chrome进程"""
+    if not profile_path:
+        return None
+    for process in driver.children():
+        try:
+            cmdline = process.cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if any("user-data-dir" in arg and arg.endswith(profile_path) for arg in cmdline):
+            return process
+    return None
+
+
+def _process_tree(root):
+    """获取进程及其所有子进程；进程已退出（或进程号被复用）时返回空列表"""
+    try:
+        if not root.is_running():
+            return []
+        return [root] + root.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return []
+
+
+def kill_process_tree(root, timeout=5):
+    """结束进程（psutil.Process）及其所有子进程，返回结束的进程数"""
+    return kill_processes(_process_tree(root), timeout)
+
+
+def kill_processes(processes, timeout=5):
+    """结束仍在运行的进程（psutil.Process 列表），返回结束的进程数
+
+    is_running() 会比对进程创建时间，已退出且进程号被复用的进程不会被误杀。
+    """
+    alive = {}
+    for process in processes:
+        try:
+            if process.is_running():
+                alive[process.pid] = process
+        except psutil.Error:
+            continue
+    tree = list(alive.values())
+    for process in tree:
+        try:
+            process.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(tree, timeout=timeout)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.Error:
+            pass
+    return len(tree)
@@ -2,18 +2,43 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 import os
+import queue
+import threading
 from datetime import datetime
 import shutil  # 用于删除文件夹
 
+PROFILE_BATCH_SIZE = 200  # 每次插入列表的配置数，避免阻塞界面
+
 class MainWindow:
-    def __init__(self, config_manager, browser_manager):
+    def __init__(self, config_manager, browser_manager=None):
         self.root = tk.Tk()
         self.root.title("Yahoo Auction Manager")
         self.config_manager = config_manager
-        self.browser_manager = browser_manager
+        self._browser_manager = browser_manager
+        self.profile_queue = queue.Queue()
+        self.first_paint_done = False
+        self.profile_rows = []        # 已读取的配置 (名称, 创建时间, 路径)
+        self.profiles_loaded = False
+        self.insert_job = None        # 尚未完成的分批插入
         
         self.setup_ui()
-        self.load_profiles()  # 初始化时加载配置
+        # 窗口首次显示后再异步加载配置列表
+        self.root.bind("<Map>", self.on_first_map, add="+")
+    
+    @property
+    def browser_manager(self):
+        """首次使用时才导入浏览器模块，避免启动时加载selenium"""
+        if self._browser_manager is None:
+            from core.browser import BrowserManager
+            self._browser_manager = BrowserManager()
+        return self._browser_manager
+    
+    def on_first_map(self, event):
+        """窗口首次绘制后开始加载配置"""
+        if self.first_paint_done:
+            return
+        self.first_paint_done = True
+        self.root.after_idle(self.update_profile_list)
         
     def setup_ui(self):
         # 设置窗口最小大小
@@ -90,32 +115,84 @@ class MainWindow:
         self.status_var.set("就绪")
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief="sunken", anchor="w")
         status_bar.pack(fill="x", pady=(5, 0))
+        
+        self.profile_tree.insert("", "end", values=("-- 加载中 --", "", ""))
     
-    def load_profiles(self):
-        """加载配置列表"""
+    def update_profile_list(self):
+        """在后台线程读取配置，读取完成后分批填充列表"""
+        self.update_status("正在加载配置...")
+        
+        def read_profiles():
+            try:
+                profiles = dict(self.config_manager.config.get("profiles", {}))
+            except Exception as e:
+                print(f"读取配置时发生错误: {str(e)}")
+                profiles = {}
+            self.profile_queue.put(profiles)
+        
+        threading.Thread(target=read_profiles, daemon=True).start()
+        self.root.after(20, self.poll_profiles)
+    
+    def poll_profiles(self):
+        """等待后台线程读取完成"""
+        try:
+            profiles = self.profile_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self.poll_profiles)
+            return
+        
+        self.set_profile_rows(profiles)
+    
+    def set_profile_rows(self, profiles):
+        """保存已读取的配置，并按当前搜索条件显示"""
+        self.profile_rows = [
+            (name, info.get("created_at", "未知"), info.get("profile_path", ""))
+            for name, info in profiles.items()
+        ]
+        self.profiles_loaded = True
+        self.filter_profiles()
+    
+    def show_profiles(self, rows):
+        """清空列表后分批插入，取消尚未完成的插入"""
+        if self.insert_job is not None:
+            self.root.after_cancel(self.insert_job)
+            self.insert_job = None
+        
         for item in self.profile_tree.get_children():
             self.profile_tree.delete(item)
-        
-        profiles = self.config_manager.config.get("profiles", {})
-        if not profiles:
+        if not self.profile_rows:
             self.profile_tree.insert("", "end", values=("-- 没有配置 --", "", ""))
+        if not rows:
+            self.update_status("就绪")
             return
-        
-        for name, info in profiles.items():
-            created_at = info.get("created_at", "未知")
-            path = info.get("profile_path", "")
-            self.profile_tree.insert("", "end", values=(name, created_at, path))
+        self.insert_profiles(rows, 0)
+    
+    def insert_profiles(self, rows, start):
+        """分批插入配置，每批之间让出事件循环"""
+        self.insert_job = None
+        for values in rows[start:start + PROFILE_BATCH_SIZE]:
+            self.profile_tree.insert("", "end", values=values)
+        
+        if start + PROFILE_BATCH_SIZE < len(rows):
+            self.insert_job = self.root.after_idle(self.insert_profiles, rows, start + PROFILE_BATCH_SIZE)
+            return
+        self.update_status("就绪")
+    
+    def load_profiles(self):
+        """加载配置列表"""
+        self.set_profile_rows(self.config_manager.config.get("profiles", {}))
     
     def filter_profiles(self, *args):
-        """根据搜索框筛选配置"""
-        search_text = self.search_var.get().lower()
-        self.load_profiles()  # 重新加载所有配置
+        """根据搜索框筛选已加载的配置"""
+        if not self.profiles_loaded:
+            # 加载完成后会按当前搜索条件显示
+            return
         
+        search_text = self.search_var.get().lower()
+        rows = self.profile_rows
         if search_text:
-            for item in self.profile_tree.get_children():
-                values = self.profile_tree.item(item)["values"]
-                if not any(search_text in str(v).lower() for v in values):
-                    self.profile_tree.delete(item)
+            rows = [values for values in rows if any(search_text in str(v).lower() for v in values)]
+        self.show_profiles(rows)
     
     def sort_profiles(self, column):
         """排序配置列表"""
@@ -273,7 +350,10 @@ class MainWindow:
         if not selection:
             messagebox.showwarning("警告", "请先选择一个配置")
             return None
-        return self.profile_tree.item(selection[0])["values"][0]
+        profile_name = self.profile_tree.item(selection[0])["values"][0]
+        if profile_name == "-- 加载中 --":
+            return None
+        return profile_name
     
     def update_status(self, message):
         """更新状态栏消息"""
@@ -1,12 +1,11 @@
 from config.config_manager import ConfigManager
-from core.browser import BrowserManager
 from gui.main_window import MainWindow
 
 def main():
     config_manager = ConfigManager()
-    browser_manager = BrowserManager()
     
-    window = MainWindow(config_manager, browser_manager)
+    # 浏览器模块（selenium）在首次启动浏览器时才导入
+    window = MainWindow(config_manager)
     window.run()
 
 if __name__ == "__main__":